@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+# ASCII byte -> hex nibble value (either case), 0xFF for anything that isn't a hex digit
+_NIBBLE: bytes = bytes(
+    int(chr(c), 16) if chr(c) in "0123456789abcdefABCDEF" else 0xFF for c in range(256)
+)
+
+
+def decode_u8(data: bytes, offset: int = 0) -> int:
+    """Decode the two ASCII hex digits at `offset` (e.g. `b"7B"`) into an integer."""
+    if len(data) < offset + 2:
+        raise ValueError(f"Invalid hex digits: {data[offset:offset + 2]!r}")
+    hi, lo = _NIBBLE[data[offset]], _NIBBLE[data[offset + 1]]
+    if (hi | lo) > 0xF:
+        raise ValueError(f"Invalid hex digits: {data[offset:offset + 2]!r}")
+    return (hi << 4) | lo
+
+
+def decode_u16(data: bytes, offset: int = 0) -> int:
+    """Decode the four ASCII hex digits at `offset` (e.g. `b"1AF8"`) into a big-endian integer."""
+    if len(data) < offset + 4:
+        raise ValueError(f"Invalid hex digits: {data[offset:offset + 4]!r}")
+    n0, n1 = _NIBBLE[data[offset]], _NIBBLE[data[offset + 1]]
+    n2, n3 = _NIBBLE[data[offset + 2]], _NIBBLE[data[offset + 3]]
+    if (n0 | n1 | n2 | n3) > 0xF:
+        raise ValueError(f"Invalid hex digits: {data[offset:offset + 4]!r}")
+    return (n0 << 12) | (n1 << 8) | (n2 << 4) | n3
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import asyncio
 import atexit
+import os
+import struct
 from typing import Any, Iterator
 
 import typer
@@ -9,52 +11,81 @@ import zstandard
 from loguru import logger
 
 from fast_elm import utils
+from fast_elm.hexdecode import decode_u8, decode_u16
 from fast_elm.reader import ElmProtocol
 from fast_elm.utils import run_sync, StatusItem
 from serial.tools.list_ports import comports
 
 
+# Each recorded message is a little-endian (timestamp, length) header followed by the raw line
+_RECORD_HEADER = struct.Struct("<dH")
+
+# How often (in seconds) buffered records are forced out to disk while recording
+SYNC_INTERVAL_S = 5
+
+
 class DataRecorder:
-    def __init__(self, buffer_size: int = 1000) -> None:
-        self._buffer: bytearray = bytearray()
+    def __init__(self, buffer_size: int = zstandard.COMPRESSION_RECOMMENDED_INPUT_SIZE) -> None:
+        self._buffer: bytearray = bytearray(buffer_size)
+        self._pos = 0
         self.buffer_size = buffer_size
-        self._fd = zstandard.open("data.obd", "wb")
+        cctx = zstandard.ZstdCompressor(level=1, write_checksum=False, threads=0)
+        self._raw = open("data.obd", "wb", buffering=0)
+        self._fd = cctx.stream_writer(
+            self._raw,
+            size=-1,
+            write_size=zstandard.COMPRESSION_RECOMMENDED_OUTPUT_SIZE,
+        )
         atexit.register(self.close)
 
-    def add_to_buffer(self, message: bytes):
-        self._buffer += message
-        if len(self._buffer) > self.buffer_size:
+    def add_record(self, timestamp: float, message: bytes):
+        end = self._pos + _RECORD_HEADER.size + len(message)
+        if end > len(self._buffer):
             self.flush()
+            end = _RECORD_HEADER.size + len(message)
+            if end > len(self._buffer):
+                self._buffer.extend(bytes(end - len(self._buffer)))
+        _RECORD_HEADER.pack_into(self._buffer, self._pos, timestamp, len(message))
+        self._buffer[end - len(message) : end] = message
+        self._pos = end
 
     def flush(self):
-        if not self._buffer:
+        if not self._pos:
             return
-        self._fd.write(self._buffer)
-        self._fd.flush()
-        self._buffer.clear()
+        with memoryview(self._buffer) as view:
+            self._fd.write(view[: self._pos])
+        self._pos = 0
+
+    def sync(self):
+        """Push everything recorded so far through the compressor and onto disk."""
+        self.flush()
+        self._fd.flush(zstandard.FLUSH_BLOCK)
+        os.fsync(self._raw.fileno())
 
     def close(self):
         self.flush()
         self._fd.close()
 
     @classmethod
-    def iter_messages(cls) -> Iterator[bytes]:
-        print("Reading messages")
-        read_chunk_size = 1000
-        buf = bytearray()
-        with zstandard.open("data.obd", "rb") as fd:
-            while True:
-                read = fd.read(read_chunk_size)
-                buf += read
-                *crt, nxt = buf.split(b"\x00")
-                yield from map(bytes, crt)
-                buf = nxt
-
-                if not read:
-                    yield bytes(buf)
-                    break
-
-            # todo - check for off-by-one error
+    def iter_messages(cls) -> Iterator[tuple[float, bytes]]:
+        logger.info("Reading messages")
+        read_size = 1024 * 1024
+        header_size = _RECORD_HEADER.size
+        dctx = zstandard.ZstdDecompressor()
+        raw = b""
+        pos = 0
+        with dctx.stream_reader(open("data.obd", "rb")) as fd:
+            while block := fd.read(read_size):
+                # Carry the trailing partial record over into the next block
+                raw = raw[pos:] + block
+                pos = 0
+                while len(raw) - pos >= header_size:
+                    timestamp, length = _RECORD_HEADER.unpack_from(raw, pos)
+                    end = pos + header_size + length
+                    if end > len(raw):
+                        break
+                    yield timestamp, raw[pos + header_size : end]
+                    pos = end
 
 
 app = typer.Typer()
@@ -87,55 +118,67 @@ async def main(
 
     current_status.value = "Connecting to ELM327"
 
-    prot = ElmProtocol(device=device, baudrate=baudrate)
+    prot = await ElmProtocol.open(device=device, baudrate=baudrate)
 
     current_status.value = "Waiting for ELM327 to be ready"
     c = 0
-    latest: dict[str, Any] = {
-        "message": StatusItem("Latest message", "<none>"),
-        "coolant_temp": StatusItem("Coolant temp", 0),
-        "rpm": StatusItem("RPM", 0),
-        "speed": StatusItem("Speed", 0),
-        "throttle position": StatusItem("Throttle", 0),
-        "commanded throttle actuation": StatusItem("Commanded Throttle", 0),
-    }
+    latest_message: StatusItem[Any] = StatusItem("Latest message", "<none>")
+    coolant_temp = StatusItem("Coolant temp", 0)
+    rpm = StatusItem("RPM", 0)
+    speed = StatusItem("Speed", 0)
+    throttle_position: StatusItem[float] = StatusItem("Throttle", 0)
+    commanded_throttle: StatusItem[float] = StatusItem("Commanded Throttle", 0)
 
     messages_per_second = StatusItem("Messages per second", 0)
+    data_recorder = DataRecorder()
 
     async def log_messages_per_second():
         nonlocal c
+        ticks = 0
         while True:
             await asyncio.sleep(1)
             messages_per_second.value = c
             c = 0
+            # atexit doesn't run when the car's power is cut, so don't hold data back for long
+            ticks += 1
+            if ticks % SYNC_INTERVAL_S == 0:
+                data_recorder.sync()
 
     asyncio.create_task(log_messages_per_second())
 
-    data_recorder = DataRecorder()
     current_status.value = "Gathering data in main loop"
-    async for timestamp, raw_line in prot.raw_stream():
+    while True:
+        try:
+            timestamp, raw_line = await prot.read_line()
+        except EOFError:
+            break
         c += 1
-        recorded_bytes = b"\x00" + f"{timestamp:.3f}".encode("utf-8") + b" " + raw_line
-        data_recorder.add_to_buffer(recorded_bytes)
-        latest["message"].value = raw_line
-        raw_line = raw_line.replace(b" ", b"")
-
-        if raw_line.startswith(b"4105"):
-            latest["coolant_temp"].value = int(raw_line[4:6], 16) - 40
-        elif raw_line.startswith(b"410C"):
-            latest["rpm"].value = int(raw_line[4:8], 16) // 4
-        elif raw_line.startswith(b"410D"):
-            latest["speed"].value = int(raw_line[4:6], 16)
-        elif raw_line.startswith(b"4111"):
-            latest["throttle position"].value = int(raw_line[4:6], 16) * 100 / 255
-        elif raw_line.startswith(b"414C"):
-            latest["commanded throttle actuation"].value = int(raw_line[4:6], 16) * 100 / 255
+        data_recorder.add_record(timestamp, raw_line)
+        latest_message.value = raw_line
+        if b" " in raw_line:
+            raw_line = raw_line.replace(b" ", b"")
+
+        try:
+            match raw_line[:4]:
+                case b"4105":
+                    coolant_temp.value = decode_u8(raw_line, 4) - 40
+                case b"410C":
+                    rpm.value = decode_u16(raw_line, 4) // 4
+                case b"410D":
+                    speed.value = decode_u8(raw_line, 4)
+                case b"4111":
+                    throttle_position.value = decode_u8(raw_line, 4) * 100 / 255
+                case b"414C":
+                    commanded_throttle.value = decode_u8(raw_line, 4) * 100 / 255
+        except ValueError:
+            # Truncated or garbled line; it's already recorded, so just skip the gauge update
+            continue
 
 
 @app.command("replay-messages")
 def replay_messages():
-    for message in DataRecorder.iter_messages():
-        print(message)
+    for timestamp, message in DataRecorder.iter_messages():
+        print(f"{timestamp:.3f}", message)
 
 
 if __name__ == "__main__":
@@ -1,13 +1,11 @@
 from __future__ import annotations
 
 import asyncio
-import multiprocessing
 
 import os
 import time
-from itertools import cycle
 from pathlib import Path
-from typing import NoReturn, AsyncIterator, cast, Any
+from typing import AsyncIterator, Any
 
 from loguru import logger
 from serial import Serial
@@ -15,98 +13,127 @@ from serial.tools.list_ports import comports
 
 from fast_elm.responses import ObdResponseBase
 
-WRITE_PIPE_BUFFER_SIZE = 2048 * 1024  # way more than enough but we don't want to block
-READ_PIPE_BUFFER_SIZE = 2048 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+# Longest wait for the ELM327's prompt during initialization (`atz` alone takes about a second)
+PROMPT_TIMEOUT_S = 5.0
 
+# get RPM, speed, throttle more frequently than coolant temp
+COMMANDS = (b"010C\r", b"010D\r", b"014C\r", b"0111\r") * 10 + (b"0105\r",)
 
-def elm_reader(write_pipe: int, read_pipe: int, port: str, baudrate: int) -> NoReturn:
-    writer = os.fdopen(write_pipe, "wb", buffering=WRITE_PIPE_BUFFER_SIZE)
-    reader = os.fdopen(read_pipe, "rb", buffering=READ_PIPE_BUFFER_SIZE)
 
-    # _serial = Serial(port=port, baudrate=baudrate)
-    _serial = Serial(port=port, baudrate=38400)
+def _read_prompt(_serial: Serial) -> None:
+    """Wait for the ELM327's `>` prompt, up to the port's read timeout."""
+    response = _serial.read_until(b">")
+    if not response.endswith(b">"):
+        raise TimeoutError(f"No prompt from ELM327 (got {response!r})")
 
+
+def initialize_elm(_serial: Serial) -> None:
+    """Reset the ELM327 and run the initialization sequence, blocking until it's ready.
+
+    Raises:
+        TimeoutError: If the ELM327 doesn't answer with a prompt in time.
+    """
     # Reset the buffer and discard any ongoing commands, then wait for the prompt
     _serial.reset_output_buffer()
     _serial.reset_input_buffer()
     _serial.write(b"\r")
+    _read_prompt(_serial)
 
     # Perform the initialization sequence and wait for the prompt
     initialization_sequence = (
         b"atz",  # reset
         b"ate0",  # echo off
-        # b"ats0",  # spaces off
+        b"ats0",  # spaces off
         b"atsp6",  # protocol 6
     )
-    _serial.write(b"\r".join(initialization_sequence) + b"\r")
-    _serial.read_until(b">")
-    print("ELM327 initialized")
-
-    # Start the main loop
-    # remaining = b""
-    commands = cycle(
-        (b"010C", b"010D", b"014C", b"0111") * 10
-        + (b"0105",),  # get RPM, speed, throttle more frequently than coolant temp
-    )
-    for next_command in commands:
-        _serial.write(next_command + b"\r")
-        data = _serial.read_until(b">")
-        writer.write(data + b"\n")
-        writer.flush()
-
-    assert False, "Should never reach this point"
+    # One command at a time, so no stale prompts are left to be mistaken for responses
+    for command in initialization_sequence:
+        _serial.write(command + b"\r")
+        _read_prompt(_serial)
+    logger.info("ELM327 initialized")
 
 
 class ElmProtocol:
-    def __init__(self, device: str, baudrate: int = 38400) -> None:
-
-        self.elm_read, self.elm_write = os.pipe()
-        self.main_read, self.main_write = os.pipe()
-
-        os.set_inheritable(self.elm_read, True)
-        os.set_inheritable(self.main_read, True)
-        elm_reader_process = multiprocessing.Process(
-            target=elm_reader,
-            kwargs=dict(
-                write_pipe=self.elm_write,
-                read_pipe=self.main_read,
-                port=device,
-                baudrate=baudrate,
-            ),
-        )
-        elm_reader_process.start()
-
-        self.at_prompt = asyncio.Event()
-        self.has_message = asyncio.Event()
-
-    async def raw_stream(self) -> AsyncIterator[tuple[float, bytes]]:
-
-        loop = asyncio.get_event_loop()
-        stream_reader = asyncio.StreamReader()
-
-        def protocol_factory():
-            return asyncio.StreamReaderProtocol(stream_reader)
-
-        transport, _ = await loop.connect_read_pipe(
-            protocol_factory=protocol_factory,
-            pipe=os.fdopen(self.elm_read, "rb"),
-        )
-
-        async for raw_line in stream_reader:
-            line = cast(bytes, raw_line)  # type: ignore
-            for elm_line in line.split(b"\r"):
-                elm_line = elm_line.strip()
-                if not elm_line:
-                    continue
-                if elm_line == b">":
-                    self.at_prompt.set()
-                    continue
-                # data = elm_line.replace(b"\r", b"").replace(b">", b"").strip()
-                yield time.time(), elm_line
+    def __init__(self, _serial: Serial) -> None:
+        """Start polling an already initialized ELM327; use `ElmProtocol.open` to connect."""
+        self._serial = _serial
+        self._command_idx = 0
+        self._accum = bytearray()
+        # Filled directly by the fd callback; `None` marks the end of the stream
+        self._lines: asyncio.Queue[tuple[float, bytes] | None] = asyncio.Queue()
+
+        # The tty is a plain fd, so the event loop can watch it directly
+        self._fd = self._serial.fd
+        os.set_blocking(self._fd, False)
+        asyncio.get_running_loop().add_reader(self._fd, self._on_readable)
+        self._send_next_command()
+
+    @classmethod
+    async def open(cls, device: str, baudrate: int = 38400) -> ElmProtocol:
+        """Connect to and initialize the ELM327 at `device`.
+
+        The blocking initialization runs in a worker thread, so the event loop keeps running.
+
+        Raises:
+            TimeoutError: If the ELM327 doesn't answer with a prompt in time.
+        """
+        # _serial = Serial(port=device, baudrate=baudrate, timeout=PROMPT_TIMEOUT_S)
+        _serial = Serial(port=device, baudrate=38400, timeout=PROMPT_TIMEOUT_S)
+        try:
+            await asyncio.to_thread(initialize_elm, _serial)
+        except BaseException:
+            _serial.close()
+            raise
+        return cls(_serial)
+
+    def _send_next_command(self) -> None:
+        self._serial.write(COMMANDS[self._command_idx])
+        self._command_idx = (self._command_idx + 1) % len(COMMANDS)
+
+    def _on_readable(self) -> None:
+        try:
+            chunk = os.read(self._fd, READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b""  # e.g. EIO once the adapter is unplugged
+        if not chunk:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            self._lines.put_nowait(None)
+            return
+
+        # Everything in one read arrived together, so it shares a single timestamp
+        timestamp = time.time()
+        self._accum.extend(chunk)
+        while (prompt_idx := self._accum.find(b">")) >= 0:
+            frame = bytes(self._accum[:prompt_idx])
+            del self._accum[: prompt_idx + 1]
+            # Keep the adapter busy while this frame is handled
+            self._send_next_command()
+            for line in frame.splitlines():
+                if line := line.strip():
+                    self._lines.put_nowait((timestamp, line))
+
+    async def read_line(self) -> tuple[float, bytes]:
+        """Wait for the next `(timestamp, line)` from the ELM327.
+
+        Raises:
+            EOFError: If the serial device has been closed.
+        """
+        item = await self._lines.get()
+        if item is None:
+            self._lines.put_nowait(None)  # keep reporting EOF to any later caller
+            raise EOFError("ELM327 serial device closed")
+        return item
 
     async def __aiter__(self) -> AsyncIterator[ObdResponseBase[Any]]:
-        async for timestamp, raw_line in self.raw_stream():
-            yield ObdResponseBase(raw_line, timestamp)
+        while True:
+            try:
+                timestamp, raw_line = await self.read_line()
+            except EOFError:
+                return
+            yield ObdResponseBase.parse(raw_line, timestamp)
             # if raw_line.startswith(b"4105"):
             #     yield "coolant_temp", int(raw_line[4:6], 16) - 40
             # elif raw_line.startswith(b"410C"):
@@ -2,13 +2,14 @@ from __future__ import annotations
 
 import struct
 import time
-from abc import ABC
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 
 from typing import TypeVar, Generic, ClassVar, Type, Callable, NamedTuple
 
+from fast_elm.hexdecode import decode_u8, decode_u16
+
 # from loguru import logger
 
 
@@ -75,17 +76,28 @@ b = obd_message_types[b"4105"].value_calculator(b"0000")
 #             return self.value == other.replace(b" ", b"")
 #         return super().__eq__(other)
 
-_command_subclasses: dict[bytes, Type[ObdResponseBase]] = {}
+_command_subclasses: dict[int, Type[ObdResponseBase]] = {}
+
 
+def _prefix_key(prefix: bytes) -> int:
+    """Pack a 4-byte response prefix into the int used to key `_command_subclasses`."""
+    return int.from_bytes(prefix[:4], "little")
 
-class ObdResponseBase(Generic[_ObdValueT], ABC):
+
+class ObdResponseBase(Generic[_ObdValueT]):
     data: bytes
     timestamp: float
+    value: _ObdValueT
 
     response_prefix: ClassVar[bytes]
     unit: ClassVar[str]
+    # Number of data bytes following the prefix; 0 when the layout isn't fixed
+    payload_size: ClassVar[int] = 0
+
+    # Fixed-width binary record: timestamp, packed response prefix, raw payload
+    _STRUCT: ClassVar[struct.Struct] = struct.Struct("<dIH")
 
-    __slots__ = ("data", "timestamp")
+    __slots__ = ("data", "timestamp", "value", "_dt")
 
     # def __init_subclass__(cls) -> None:
     #     if cls.response_prefix in _command_subclasses:
@@ -95,27 +107,42 @@ class ObdResponseBase(Generic[_ObdValueT], ABC):
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
-        if cls.response_prefix is not None:
-            _command_subclasses[cls.response_prefix] = cls
+        if cls.response_prefix:
+            _command_subclasses[_prefix_key(cls.response_prefix)] = cls
 
-    def __new__(cls, data: bytes, timestamp: float) -> ObdResponseBase:
-        print(data)
-        data = data.lstrip(b"\x00")
-        if cls is ObdResponseBase:
-            data = data.replace(b" ", b"")
-            prefix = data[:4]
-            if prefix in _command_subclasses:
-                return _command_subclasses[prefix](data, timestamp)
-            # logger.warning(f"Unknown response prefix: {prefix!r}")
-            else:
-                return ObdResponse(data, timestamp)
-            # return _command_subclasses[None](data, timestamp)
+    @staticmethod
+    def parse(data: bytes, timestamp: float) -> ObdResponseBase:
+        """Build the response subclass matching the prefix of a raw ELM327 line."""
+        data = ObdResponseBase._normalize(data)
+        cls = _command_subclasses.get(_prefix_key(data), ObdResponse)
+        return cls._build(data, timestamp)
 
-        return super().__new__(cls)
+    @classmethod
+    def _build(cls, data: bytes, timestamp: float) -> ObdResponseBase:
+        try:
+            value = cls._decode(data)
+        except ValueError:
+            # Truncated or garbled payload; keep the raw line rather than failing the stream
+            return ObdResponse._build(data, timestamp)
+        response = cls.__new__(cls)
+        response.data = data
+        response.timestamp = timestamp
+        response.value = value
+        return response
 
     def __init__(self, data: bytes, timestamp: float) -> None:
-        self.data = data.replace(b" ", b"")
+        self.data = self._normalize(data)
         self.timestamp = timestamp
+        self.value = self._decode(self.data)
+
+    @staticmethod
+    def _normalize(data: bytes) -> bytes:
+        """Strip leading NUL padding and ELM327 spaces, copying only when there are any."""
+        if data[:1] == b"\x00":
+            data = data.lstrip(b"\x00")
+        if b" " in data:
+            data = data.replace(b" ", b"")
+        return data
 
     # @property
     # def response_type(self) -> ElmResponseType:
@@ -123,26 +150,36 @@ class ObdResponseBase(Generic[_ObdValueT], ABC):
     # return ElmResponseType(self.data[:4])
 
     @classmethod
-    def from_bin(cls, bin_data: bytes):
-        timestamp, data = struct.unpack("f16s", bin_data)
-        return cls(data, timestamp)
-
-    @property
-    def value(self) -> T:
+    def from_bin(cls, bin_data: bytes) -> ObdResponseBase:
+        timestamp, prefix_key, payload = cls._STRUCT.unpack_from(bin_data)
+        response_cls = _command_subclasses.get(prefix_key)
+        if response_cls is None:
+            raise ValueError(f"Unknown response prefix in binary record: {prefix_key:#x}")
+        data = response_cls.response_prefix + b"%0*X" % (2 * response_cls.payload_size, payload)
+        return response_cls._build(data, timestamp)
+
+    @staticmethod
+    def _decode(data: bytes) -> _ObdValueT:
+        """Compute the response value from its normalized data; run once at construction."""
         raise NotImplementedError
 
     @property
     def dt(self) -> datetime:
-        return datetime.fromtimestamp(self.timestamp)
+        try:
+            return self._dt
+        except AttributeError:
+            self._dt = datetime.fromtimestamp(self.timestamp)
+            return self._dt
 
     @property
     def bin(self) -> bytes:
-        padded_data = self.data.rjust(16, b"\x00")
-        return struct.pack(
-            "f16s",
-            self.timestamp,
-            padded_data,
-        )
+        if self.payload_size == 1:
+            payload = decode_u8(self.data, 4)
+        elif self.payload_size == 2:
+            payload = decode_u16(self.data, 4)
+        else:
+            raise ValueError(f"{self.__class__.__name__} has no fixed-width binary form")
+        return self._STRUCT.pack(self.timestamp, _prefix_key(self.data), payload)
 
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__}({self.value} {self.unit}, {self.dt.isoformat()})>"
@@ -153,50 +190,45 @@ class ObdResponseBase(Generic[_ObdValueT], ABC):
 
 class ObdResponse(ObdResponseBase[bytes]):
     unit: ClassVar[str] = "bytes"
-    byte_count: ClassVar[int] = 4
     response_prefix = b""
 
-    @property
-    def value(self) -> bytes:
-        return self.data
+    @staticmethod
+    def _decode(data: bytes) -> bytes:
+        return data
 
 
 class ResponseCoolantTemperature(ObdResponseBase[int]):
     response_prefix: ClassVar[bytes] = b"4105"
-    byte_count: ClassVar[int] = 4
+    payload_size: ClassVar[int] = 1
     unit: ClassVar[str] = "°C"
 
-    @property
-    def value(self) -> int:
-        return int(self.data[4:], 16) - 40
+    @staticmethod
+    def _decode(data: bytes) -> int:
+        return decode_u8(data, 4) - 40
 
 
 class ResponseEngineRPM(ObdResponseBase[float]):
     response_prefix: ClassVar[bytes] = b"410C"
-    byte_count: ClassVar[int] = 4
+    payload_size: ClassVar[int] = 2
     unit = "rpm"
 
-    @property
-    def value(self) -> float:
-        return int(self.data[4:], 16) / 4
+    @staticmethod
+    def _decode(data: bytes) -> float:
+        return decode_u16(data, 4) / 4
 
 
 class ResponseVehicleSpeed(ObdResponseBase[int]):
     response_prefix: ClassVar[bytes] = b"410D"
+    payload_size: ClassVar[int] = 1
     unit = "km/h"
 
-    @property
-    def value(self) -> int:
-        return int(self.data[4:], 16)
+    @staticmethod
+    def _decode(data: bytes) -> int:
+        return decode_u8(data, 4)
 
 
-_command_subclasses[ResponseCoolantTemperature.response_prefix] = ResponseCoolantTemperature
-_command_subclasses[ResponseEngineRPM.response_prefix] = ResponseEngineRPM
-_command_subclasses[ResponseVehicleSpeed.response_prefix] = ResponseVehicleSpeed
 
-RESPONSE_PREFIXES = {
-    b"4105": ResponseCoolantTemperature,
-    b"410C": ResponseEngineRPM,
-    b"410D": ResponseVehicleSpeed,
-    b"": ObdResponse,
-}
+# Derived from the subclass registry so the two can't drift apart; b"" is the fallback
+RESPONSE_PREFIXES: dict[bytes, Type[ObdResponseBase]] = {
+    cls.response_prefix: cls for cls in _command_subclasses.values()
+} | {b"": ObdResponse}
@@ -1,17 +1,21 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import functools
-from abc import ABC
+import inspect
+import os
 from typing import (
     Any,
     Callable,
     ClassVar,
     Coroutine,
     Generic,
+    Iterator,
     ParamSpec,
     Type,
     TypeVar,
+    cast,
 )
 
 import loguru
@@ -21,6 +25,11 @@ from rich.console import ConsoleRenderable, Group, RenderableType, RichCast
 from rich.live import Live as RichLive
 from rich.panel import Panel
 
+try:
+    from uvloop import run as _run  # optional, faster event loop
+except ImportError:
+    _run = asyncio.run
+
 T = TypeVar("T")
 _U = TypeVar("_U")
 _V = TypeVar("_V")
@@ -37,32 +46,38 @@ def run_sync(f: Callable[P, Coroutine[Any, Any, T]]) -> Callable[P, T]:
         f: The function to run synchronously.
 
     Returns:
-        A new function that runs the original one with `asyncio.run`.
+        A new function that runs the original one with `uvloop.run` if uvloop is installed,
+        or `asyncio.run` otherwise.
     """
 
     @functools.wraps(f)
     def decorated(*args: P.args, **kwargs: P.kwargs) -> T:
-        return asyncio.run(f(*args, **kwargs))
+        return _run(f(*args, **kwargs))
 
     return decorated
 
 
-class StatusItemBase(RichCast, Generic[T], ABC):
+# Rich finds `__rich__` by duck typing, so the `RichCast` protocol (and the `ABCMeta` that comes
+# with it) is left out of the bases
+class StatusItemBase(Generic[T]):
     _status_items: ClassVar[dict[str, StatusItemBase[Any]]] = {}
-    _dirty: ClassVar[asyncio.Event] = asyncio.Event()
-    _updater_running: ClassVar[bool] = False
+    # Same items as `_status_items`, in display order, for building the panel
+    _status_items_list: ClassVar[list[StatusItemBase[Any]]] = []
+    # Bumped whenever an item is registered, so the cached status panel gets rebuilt
+    _gen: ClassVar[int] = 0
+    _panel_gen: ClassVar[int] = -1
+    _status_panel: ClassVar[Panel | None] = None
 
     _value: T
+    _prefix: str = ""
+    # Markup for the current value, built on the loop thread whenever the value is set
+    _cached_render: str = ""
 
     def __init_subclass__(cls: Type[StatusItemBase[T]], **kwargs: Any) -> None:
         cls._status_items = StatusItemBase._status_items
         super().__init_subclass__(**kwargs)
         # todo maybe move logic to __init__
 
-    # def __init__(self) -> None:
-    #     if not self._updater_running:
-    #         asyncio.create_task(self.update_status_loop())
-
     def __rich__(self) -> ConsoleRenderable | RichCast | str:
         raise NotImplementedError
 
@@ -72,30 +87,41 @@ class StatusItemBase(RichCast, Generic[T], ABC):
 
     @value.setter
     def value(self, value: T) -> None:
+        # Skip rebuilding the markup for an unchanged value; the type check keeps e.g. 0 -> 0.0,
+        # which renders differently, from counting as unchanged
+        if type(value) is type(self._value) and value == self._value:
+            return
         self._value = value
-        StatusItemBase._dirty.set()
+        # Built here rather than lazily in `__rich__`, which runs on Rich's refresh thread and
+        # could otherwise store a render of the old value after this update
+        self._cached_render = f"{self._prefix}{value}[/]"
+
+    @classmethod
+    @contextlib.contextmanager
+    def batch(cls) -> Iterator[None]:
+        """Group several updates made together.
+
+        Rich's refresh thread reads each item's current value on every refresh, so updates
+        need no scheduling and this only marks the block.
+        """
+        yield
 
     @staticmethod
-    async def update_status_loop() -> None:
-        """Update the status panel."""
-        try:
-            if StatusItemBase._updater_running:
-                # logger.error("Status updater already running - there should only be one. Exiting.")
-                return
-            StatusItemBase._updater_running = True
-            while True:
-                await StatusItemBase._dirty.wait()
-                await asyncio.sleep(0.01)  # debounce
-                status_panel = Panel(
-                    Group(*StatusItemBase._status_items.values()),
-                    title="Status",
-                    title_align="left",
-                    border_style="bright_blue",
-                )
-                live.update(status_panel, refresh=True)
-                StatusItemBase._dirty.clear()
-        finally:
-            StatusItemBase._updater_running = False
+    def _update_panel() -> None:
+        """Rebuild the status panel and hand it to the Live display if the items changed."""
+        # Items render their current value on every refresh, so the panel (and `live.update`,
+        # which contends with the refresh thread for its lock) is only needed when the set of
+        # items changes
+        if StatusItemBase._panel_gen == StatusItemBase._gen:
+            return
+        StatusItemBase._panel_gen = StatusItemBase._gen
+        StatusItemBase._status_panel = Panel(
+            Group(*StatusItemBase._status_items_list),
+            title="Status",
+            title_align="left",
+            border_style="bright_blue",
+        )
+        live.update(StatusItemBase._status_panel)
 
 
 class StatusItem(StatusItemBase[T]):
@@ -107,11 +133,21 @@ class StatusItem(StatusItemBase[T]):
         value_color: str = "white",
     ) -> None:
         super().__init__()
+        previous = StatusItemBase._status_items.get(name)
         StatusItemBase._status_items[name] = self
+        if previous is None:
+            StatusItemBase._status_items_list.append(self)
+        else:
+            items = StatusItemBase._status_items_list
+            items[items.index(previous)] = self
+        StatusItemBase._gen += 1
         self.name = name
         self._value: T = value
         self.name_color = name_color
         self.value_color = value_color
+        self._prefix = f"[bold {name_color}]{name}[/][bold white]:[/] [{value_color}]"
+        self._cached_render = f"{self._prefix}{value}[/]"
+        StatusItemBase._update_panel()
 
     def __str__(self) -> str:
         return f"{self.name}: {self.value}"
@@ -120,15 +156,24 @@ class StatusItem(StatusItemBase[T]):
         return f"{self.__class__.__name__}({self.name!r}, {self.value!r})"
 
     def __rich__(self) -> ConsoleRenderable | RichCast | str:
-        return (
-            f"[bold {self.name_color}]{self.name}[/]"
-            f"[bold white]:[/] [{self.value_color}]{self.value}[/]"
-        )
+        return self._cached_render
 
     def update_on_fun_entry(
         self, fun: Callable[P, _U], message: str | None = None
     ) -> Callable[P, _U]:
-        """Update the status item when the function is entered."""
+        """Update the status item when the function is entered.
+
+        Coroutine functions are wrapped in a coroutine, so the update happens when the
+        coroutine starts running rather than when it's created.
+        """
+        if inspect.iscoroutinefunction(fun):
+
+            @functools.wraps(fun)
+            async def async_decorated(*args: P.args, **kwargs: P.kwargs) -> Any:
+                self.value = f"Entering {fun.__name__}" if message is None else message
+                return await fun(*args, **kwargs)  # type: ignore[misc]
+
+            return cast(Callable[P, _U], async_decorated)
 
         @functools.wraps(fun)
         def decorated(*args: P.args, **kwargs: P.kwargs) -> _U:
@@ -140,7 +185,21 @@ class StatusItem(StatusItemBase[T]):
     def update_on_fun_exit(
         self, fun: Callable[P, _U], message: str | None = None
     ) -> Callable[P, _U]:
-        """Update the status item when the function exits."""
+        """Update the status item when the function exits.
+
+        Coroutine functions are awaited inside the wrapper, so the update happens when the
+        coroutine finishes rather than as soon as it's created.
+        """
+        if inspect.iscoroutinefunction(fun):
+
+            @functools.wraps(fun)
+            async def async_decorated(*args: P.args, **kwargs: P.kwargs) -> Any:
+                try:
+                    return await fun(*args, **kwargs)  # type: ignore[misc]
+                finally:
+                    self.value = f"Exiting {fun.__name__}" if message is None else message
+
+            return cast(Callable[P, _U], async_decorated)
 
         @functools.wraps(fun)
         def decorated(*args: P.args, **kwargs: P.kwargs) -> _U:
@@ -159,25 +218,36 @@ class PanStatusItem(StatusItem[str]):
 
 cs = RichConsole()
 live_obj = Panel("hello world!", title="Live", expand=True, height=10)
-live = RichLive(live_obj, console=cs, auto_refresh=False)
-
-
-async def alog(message: loguru.Message) -> None:
-    """Custom logging function."""
-    level_colors = {
-        "DEBUG": "blue",
-        "TRACE": "white",
-        "INFO": "yellow",
-        "IMPORTANT": "yellow",
-        "WARNING": "orange",
-        "ERROR": "red",
-        "CRITICAL": "bold red",
-    }
+live = RichLive(live_obj, console=cs, auto_refresh=True, refresh_per_second=20)
+
+
+level_colors = {
+    "DEBUG": "blue",
+    "TRACE": "white",
+    "INFO": "yellow",
+    "IMPORTANT": "yellow",
+    "WARNING": "orange",
+    "ERROR": "red",
+    "CRITICAL": "bold red",
+}
+# Padded, colored level column for each known level
+_LEVEL_FMT = {name: f"[{color}]{name:<9}[/]" for name, color in level_colors.items()}
+# Records below this level number are not sent to the console (DEBUG is 10, TRACE is 5)
+_MIN_PRINT_LEVEL_NO = int(os.environ.get("FAST_ELM_CONSOLE_LEVEL_NO", "10"))
+
+
+def alog(message: loguru.Message) -> None:
+    """Custom logging function.
+
+    This is a plain function rather than a coroutine: `cs.print` never awaits, and loguru
+    would otherwise schedule a new task for every record.
+    """
     level = message.record["level"].name
-    color = level_colors.get(level, "purple")
+    level_fmt = _LEVEL_FMT.get(level) or f"[purple]{level:<9}[/]"
+    record_time = message.record["time"]
     to_print = (
-        f"{message.record['time'].strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} "
-        f"| [{color}]{level:<9}[/] | "
+        f"{record_time.strftime('%Y-%m-%d %H:%M:%S')}.{record_time.microsecond // 1000:03d} "
+        f"| {level_fmt} | "
         f"{message.record['message']}"
     )
     cs.print(to_print)
@@ -185,8 +255,16 @@ async def alog(message: loguru.Message) -> None:
 
 logger.configure(
     handlers=[
-        {"sink": alog, "level": "TRACE"},
-        {"sink": "file.log", "serialize": True},
+        {"sink": alog, "level": _MIN_PRINT_LEVEL_NO},
+        {
+            # Plain text written from a background thread, so the event loop never waits on
+            # JSON encoding or disk writes
+            "sink": "file.log",
+            "serialize": False,
+            "level": "INFO",
+            "enqueue": True,
+            "format": "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level} | {message}",
+        },
     ]
 )
 
@@ -194,14 +272,10 @@ logger.configure(
 def my_main(fn: Callable[P, Coroutine[_U, _V, T]]) -> Callable[P, Coroutine[_U, _V, T]]:
     @functools.wraps(fn)
     async def _main(*args: P.args, **kwargs: P.kwargs) -> T:
+        if hasattr(asyncio, "eager_task_factory"):  # Python 3.12+
+            asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
         with live:
-            _ = asyncio.create_task(StatusItemBase.update_status_loop())
-            result = await fn(*args, **kwargs)
-            other_tasks = asyncio.all_tasks()
-            if (crt_task := asyncio.current_task()) is not None:
-                other_tasks.remove(crt_task)
-            await asyncio.gather(*other_tasks)
-        return result
+            return await fn(*args, **kwargs)
 
     return _main
 
@@ -214,13 +288,17 @@ async def main() -> None:
     i = 0
     i_status = StatusItem("i", "current mod: 0")
     power_status = PanStatusItem("power", "0")
+    sleep = asyncio.sleep
+    trace = logger.trace
+    batch = StatusItemBase.batch
     while True:
-        await asyncio.sleep(0.1)
-        logger.trace(f"hello world {i}")
-        if i % 2 != 0:
-            power_status.value = str(i**2)
-        if i % 10 == 0:
-            i_status.value = f"current mod: {i}"
+        await sleep(0.1)
+        trace(f"hello world {i}")
+        with batch():
+            if i % 2 != 0:
+                power_status.value = str(i**2)
+            if i % 10 == 0:
+                i_status.value = f"current mod: {i}"
         i += 1
 
 
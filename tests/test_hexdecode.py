@@ -0,0 +1,34 @@
+import pytest
+
+from fast_elm.hexdecode import decode_u8, decode_u16
+
+
+@pytest.mark.parametrize("data, expected", [(b"00", 0), (b"7B", 0x7B), (b"7b", 0x7B), (b"fF", 0xFF)])
+def test_decode_u8(data, expected):
+    assert decode_u8(data) == expected
+
+
+@pytest.mark.parametrize(
+    "data, expected", [(b"0000", 0), (b"1AF8", 0x1AF8), (b"1af8", 0x1AF8), (b"FfFf", 0xFFFF)]
+)
+def test_decode_u16(data, expected):
+    assert decode_u16(data) == expected
+
+
+def test_offset():
+    assert decode_u8(b"41057B", 4) == 0x7B
+    assert decode_u16(b"410C1AF8", 4) == 0x1AF8
+
+
+@pytest.mark.parametrize("data, offset", [(b"7G", 0), (b" 7", 0), (b"4105", 4), (b"41057", 4)])
+def test_decode_u8_invalid(data, offset):
+    with pytest.raises(ValueError):
+        decode_u8(data, offset)
+
+
+@pytest.mark.parametrize(
+    "data, offset", [(b"1AFX", 0), (b"-1AF", 0), (b"410C", 4), (b"410C1AF", 4)]
+)
+def test_decode_u16_invalid(data, offset):
+    with pytest.raises(ValueError):
+        decode_u16(data, offset)
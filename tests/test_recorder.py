@@ -0,0 +1,49 @@
+import pytest
+
+from fast_elm.main import DataRecorder
+
+
+@pytest.fixture(autouse=True)
+def _in_tmp_path(tmp_path, monkeypatch):
+    # DataRecorder reads and writes `data.obd` in the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+def _record(records, buffer_size=None):
+    recorder = DataRecorder() if buffer_size is None else DataRecorder(buffer_size)
+    for timestamp, message in records:
+        recorder.add_record(timestamp, message)
+    recorder.close()
+    return list(DataRecorder.iter_messages())
+
+
+def test_round_trip():
+    records = [(1.5, b"410C1AF8"), (2.25, b"41 0D 32"), (3.0, b"")]
+    assert _record(records) == records
+
+
+def test_records_spanning_flushes():
+    # A tiny buffer forces a flush every few records
+    records = [(float(i), b"410C%04X" % i) for i in range(1000)]
+    assert _record(records, buffer_size=64) == records
+
+
+def test_records_spanning_read_blocks():
+    # Well over the 1 MiB read block, with record boundaries landing mid-block
+    records = [(i / 10, b"410D%02X" % (i % 256) * (1 + i % 7)) for i in range(100_000)]
+    assert _record(records) == records
+
+
+def test_record_larger_than_buffer():
+    records = [(1.0, b"small"), (2.0, bytes(range(256)) * 4), (3.0, b"after")]
+    assert _record(records, buffer_size=32) == records
+
+
+def test_sync_makes_records_readable_before_close():
+    recorder = DataRecorder()
+    records = [(float(i), b"4105%02X" % (i % 256)) for i in range(1000)]
+    for timestamp, message in records:
+        recorder.add_record(timestamp, message)
+    recorder.sync()
+    assert list(DataRecorder.iter_messages()) == records
+    recorder.close()
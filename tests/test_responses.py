@@ -0,0 +1,47 @@
+import pytest
+
+from fast_elm.responses import (
+    ObdResponse,
+    ObdResponseBase,
+    ResponseCoolantTemperature,
+    ResponseEngineRPM,
+    ResponseVehicleSpeed,
+)
+
+
+@pytest.mark.parametrize(
+    "line, cls, value",
+    [
+        (b"41057B", ResponseCoolantTemperature, 0x7B - 40),
+        (b"410C1AF8", ResponseEngineRPM, 0x1AF8 / 4),
+        (b"41 0D 32", ResponseVehicleSpeed, 0x32),
+        (b"\x00\x00410C1af8", ResponseEngineRPM, 0x1AF8 / 4),
+    ],
+)
+def test_parse(line, cls, value):
+    response = ObdResponseBase.parse(line, 1.5)
+    assert type(response) is cls
+    assert response.value == value
+    assert response.timestamp == 1.5
+
+
+@pytest.mark.parametrize("line", [b"410C", b"410C1A", b"4105ZZ", b"NO DATA", b"SEARCHING..."])
+def test_parse_falls_back_to_raw_response(line):
+    response = ObdResponseBase.parse(line, 1.5)
+    assert type(response) is ObdResponse
+    assert response.value == line.replace(b" ", b"")
+
+
+@pytest.mark.parametrize("line", [b"41057B", b"410C1AF8", b"410D32", b"410CFFFF", b"410500"])
+def test_bin_round_trip(line):
+    response = ObdResponseBase.parse(line, 1234567890.125)
+    restored = ObdResponseBase.from_bin(response.bin)
+    assert type(restored) is type(response)
+    assert restored.data == response.data
+    assert restored.value == response.value
+    assert restored.timestamp == response.timestamp
+
+
+def test_bin_rejects_unstructured_responses():
+    with pytest.raises(ValueError):
+        ObdResponseBase.parse(b"NO DATA", 0.0).bin